@@ -1,13 +1,35 @@
+import heapq
+import os
 import re
 import pymupdf
-import csv
 from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from typing import Dict, Pattern, Optional, Tuple
 from tqdm import tqdm
 
+try:
+    import ahocorasick
+except ImportError:  # optional prefilter dependency (pip install pyahocorasick)
+    ahocorasick = None
+
 class PDFProcessor:
+    # Characters that force a CSV field to be quoted (RFC 4180)
+    _CSV_UNSAFE = re.compile(r'[,"\r\n]')
+    # Whitespace runs collapsed by parse_record
+    _WS_RE = re.compile(r'\s+')
+    # A field needs normalizing when it has a doubled whitespace run, leading
+    # or trailing whitespace, or any whitespace char that isn't a plain space
+    _WS_DIRTY_RE = re.compile(r'\s{2,}|^\s|\s$|[^\S ]')
+    # Shape of a "literal label, then one token" pattern, e.g. r'^CPF:\s+(\S+)';
+    # these are served by str.find instead of the regex engine
+    _FAST_SHAPE = re.compile(r'^(\^)?([^\\.^$*+?{}\[\]()|]+)(\\s[*+])\(\\S\+\)$')
+    # Flush the accumulated output buffer once it grows past this size
+    _FLUSH_BYTES = 1 << 16
+
     def __init__(self, pdf_file_path: str, csv_file_path: str = 'output.csv', regexes: Dict[str, Pattern] = None,
-                 required_fields: Optional[list] = None):
+                 required_fields: Optional[list] = None, backend: str = 're', use_hyperscan: bool = False,
+                 sort_text: bool = True, ascii_mode: bool = False):
         """
         Initialize the PDF processor with file paths and regular expressions.
 
@@ -15,9 +37,25 @@ class PDFProcessor:
         :param csv_file_path: Path to the CSV file to write the results.
         :param regexes: Dictionary of regex patterns, where keys will be used as field names in the namedtuple.
         :param required_fields: List of fields that must be non-null for the record to be considered complete.
+        :param backend: Regex engine to use: 're' (built-in) or 're2' (google-re2, linear-time
+                        matching). Patterns that re2 cannot compile fall back to 're'.
+        :param use_hyperscan: Prefilter the document with Intel Hyperscan (requires pyperscan);
+                              only lines Hyperscan flags are re-run with the Python engine to
+                              pull capture groups. Ignored when pyperscan is not installed.
+        :param sort_text: Sort text blocks into reading order before extraction. Disable when
+                          the patterns don't depend on line ordering to skip a per-page
+                          geometric sort.
+        :param ascii_mode: Compile patterns with re.ASCII so \\s, \\w, and \\d use single-byte
+                           table lookups instead of Unicode property checks. Only enable for
+                           ASCII-only documents. Independent of this flag, prefer \\S+ over .+
+                           in patterns - it cannot backtrack greedily across a line.
         """
         self.pdf_file_path = pdf_file_path
         self.csv_file_path = csv_file_path
+        self.backend = backend
+        self.use_hyperscan = use_hyperscan
+        self.sort_text = sort_text
+        self.ascii_mode = ascii_mode
         self.regex_mode_enabled = regexes is not None
 
         if self.regex_mode_enabled:
@@ -25,7 +63,11 @@ class PDFProcessor:
         else:
             self.regexes = None
             self.Line = None
-            self.empty_record = None
+            self.combined = None
+            self._extra_targets = []
+            self._fast_targets = []
+            self._line_targets = []
+            self._hyperscan = None
 
     def initialize_regex_mode(self, regexes: Dict[str, Pattern], required_fields: Optional[list]):
         """
@@ -36,96 +78,697 @@ class PDFProcessor:
         :param required_fields: List of required fields.
         """
 
+        # Keep the raw patterns so worker processes can rebuild the processor
+        self._regex_source = dict(regexes)
         self.regexes = self.compile_regexes(regexes)
 
-        # Dynamically create the field names for namedtuple
+        # Dynamically create the field names for namedtuple, remembering which
+        # record positions each field's capture groups land in
         field_names = []
+        self._field_idxs = {}
         for field, regex in self.regexes.items():
-            num_groups = re.compile(regex).groups
+            num_groups = regex.groups
+            first_idx = len(field_names)
             if num_groups == 1:
                 field_names.append(field)  # Single field name
             else:
                 # Create field names with suffixes for multiple groups
                 field_names.extend([f"{field}_{i + 1}" for i in range(num_groups)])
+            self._field_idxs[field] = tuple(range(first_idx, len(field_names)))
+
+        # Dispatch table for the per-field fallback: bound search methods paired
+        # with the record positions their groups fill
+        self._targets = [(regex.search, self._field_idxs[field])
+                         for field, regex in self.regexes.items()]
+
+        # Aho-Corasick prefilter on the patterns' literal prefixes: one automaton
+        # pass tells which patterns can possibly match a line
+        self._ac, self._always_targets, self._ac_targets = self._build_prefix_filter()
 
-        # Create the namedtuple dynamically using regex dictionary keys as field names
+        # Tabular PDFs repeat lines (headers, footers, page furniture); caching
+        # per-line scan results lets repeats skip the regex pass entirely
+        self._scan_line = lru_cache(maxsize=4096)(self._scan_line_uncached)
+
+        # Create the namedtuple dynamically using regex dictionary keys as field names.
+        # Records are built in a plain list while scanning (mutating a list avoids a
+        # namedtuple copy per match); the namedtuple only provides the CSV header.
         self.Line = namedtuple('Line', field_names)
-        self.empty_record = self.Line(*([None] * len(self.Line._fields)))
-        
+        self._field_index = {name: i for i, name in enumerate(field_names)}
+        self._num_fields = len(field_names)
+
         # If required_fields is not provided, set it to the first field
         self.required_fields = required_fields if required_fields else [field_names[0]]
 
+        # Resolve the required fields to record positions once, so the per-line
+        # completeness check is a couple of list indexings instead of dict lookups
+        self._required_idx = tuple(self._field_index[field] for field in self.required_fields)
+
+        # Merge all patterns into one alternation so each line is scanned once
+        self.combined = self.combine_regexes(self.regexes)
+
+        # Optional SIMD prefilter over the raw bytes (None when disabled or unavailable)
+        self._hyperscan = self._build_hyperscan() if self.use_hyperscan else None
+
+    @classmethod
+    def _fast_label_spec(cls, pattern: str) -> Optional[Tuple[str, bool, bool]]:
+        """
+        Detect "literal label, whitespace, one token" patterns like
+        r'^CPF:\\s+(\\S+)'. Returns (label, anchored to line start, whitespace
+        required) or None when the pattern has any other shape.
+        """
+        match = cls._FAST_SHAPE.match(pattern)
+        if not match:
+            return None
+        anchor, label, whitespace = match.groups()
+        return label, bool(anchor), whitespace.endswith('+')
+
+    @staticmethod
+    def _fast_events(label: str, anchored: bool, needs_ws: bool, idxs: tuple, text: str):
+        """
+        Yield (start, end, record positions, values) for a label-token pattern
+        using str.find and character scans, bypassing the regex engine. Matches
+        what r'label\\s+(\\S+)' (or \\s*) would produce line by line: the
+        whitespace run stops at a newline, like the per-line scanner.
+        """
+        label_len = len(label)
+        text_len = len(text)
+        pos = 0
+        while (start := text.find(label, pos)) != -1:
+            # Failed attempts resume just past the label; successful ones resume
+            # after the token, like finditer's non-overlapping matches
+            pos = start + 1
+            if anchored and start > 0 and text[start - 1] != '\n':
+                continue
+            i = start + label_len
+            while i < text_len and text[i] != '\n' and text[i].isspace():
+                i += 1
+            if needs_ws and i == start + label_len:
+                continue  # pattern requires at least one whitespace char
+            value_end = i
+            while value_end < text_len and not text[value_end].isspace():
+                value_end += 1
+            if value_end == i:
+                continue  # no token follows the label
+            yield start, value_end, idxs, (text[i:value_end],)
+            pos = value_end
+
+    @staticmethod
+    def _literal_prefix(pattern: str) -> str:
+        """
+        Return the literal prefix every match of the pattern must contain, or ''
+        when none can be derived safely.
+        """
+        if '|' in pattern:
+            return ''  # an alternation's prefix only covers one branch
+        if pattern.startswith('^'):
+            pattern = pattern[1:]
+        prefix = []
+        for char in pattern:
+            if char in '.^$*+?{}[]()|\\':
+                if char in '*?{' and prefix:
+                    prefix.pop()  # the quantifier makes the previous literal optional
+                break
+            prefix.append(char)
+        return ''.join(prefix)
+
+    @staticmethod
+    def _line_scoped(pattern: str) -> Optional[str]:
+        """
+        Rewrite a pattern so it cannot consume a newline when run over the
+        whole-document buffer, keeping it equivalent to matching each line in
+        isolation: a bare \\s becomes [^\\S\\n]. Returns None when the pattern
+        contains some other construct that can match a newline (\\W, \\D, a
+        negated or \\s-bearing character class, an explicit newline or numeric
+        escape), in which case the caller must scan it line by line.
+        """
+        out = []
+        i = 0
+        length = len(pattern)
+        in_class = False
+        while i < length:
+            char = pattern[i]
+            if char == '\n':
+                return None
+            if char == '\\' and i + 1 < length:
+                escape = pattern[i + 1]
+                if escape == 's' and not in_class:
+                    out.append(r'[^\S\n]')
+                    i += 2
+                    continue
+                if escape in 'sWDnxuUN0123456789':
+                    # matches a newline outright, or encodes a character we
+                    # would have to resolve to know (\\x.., octal, backrefs)
+                    return None
+                out.append(char)
+                out.append(escape)
+                i += 2
+                continue
+            if not in_class and char == '[':
+                in_class = True
+                out.append(char)
+                i += 1
+                if i < length and pattern[i] == '^':
+                    return None  # a negated class matches a newline
+                if i < length and pattern[i] == ']':
+                    out.append(']')  # a leading ] is a literal
+                    i += 1
+                continue
+            if in_class and char == ']':
+                in_class = False
+            out.append(char)
+            i += 1
+        return ''.join(out)
+
+    def _build_prefix_filter(self):
+        """
+        Split the fields into those whose pattern carries a literal prefix -
+        findable for all fields at once with a single Aho-Corasick pass - and
+        those that must run on every line.
+
+        :return: A tuple of (automaton, always-run dispatch targets, field ->
+                 dispatch target map). The automaton is None when pyahocorasick
+                 is not installed or no pattern has a usable prefix, in which
+                 case every field runs on every line.
+        """
+        if ahocorasick is None:
+            return None, self._targets, {}
+
+        prefixes = {}
+        always = []
+        ac_targets = {}
+        for field, regex in self.regexes.items():
+            target = (regex.search, self._field_idxs[field])
+            # IGNORECASE would need case-folded entries in the case-sensitive
+            # automaton, and VERBOSE changes how the source reads; patterns
+            # carrying either run on every line instead
+            if regex.flags & (re.IGNORECASE | re.VERBOSE):
+                always.append(target)
+                continue
+            prefix = self._literal_prefix(regex.pattern)
+            if len(prefix) >= 2:
+                prefixes.setdefault(prefix, []).append(field)
+                ac_targets[field] = target
+            else:
+                always.append(target)
+
+        if not ac_targets:
+            return None, self._targets, {}
+
+        automaton = ahocorasick.Automaton()
+        for prefix, fields in prefixes.items():
+            automaton.add_word(prefix, tuple(fields))
+        automaton.make_automaton()
+        return automaton, always, ac_targets
+
+    def _build_hyperscan(self):
+        """
+        Compile all field patterns into a single Hyperscan block database, used
+        as a prefilter: Hyperscan reports which pattern hit and where, and only
+        that pattern is re-run with the Python engine for capture groups.
+
+        :return: The compiled database, or None when pyperscan is not installed
+                 or a pattern uses constructs Hyperscan does not support.
+        """
+        try:
+            from pyperscan import BlockDatabase, Flag, Pattern
+        except ImportError:
+            return None
+
+        flag_map = {re.IGNORECASE: Flag.CASELESS, re.DOTALL: Flag.DOTALL}
+        patterns = []
+        for field, regex in self.regexes.items():
+            # MULTILINE: in block mode Hyperscan otherwise anchors ^/$ to the
+            # whole buffer, so patterns like ^CPF: would never hit past line one
+            hs_flags = [Flag.SOM_LEFTMOST, Flag.MULTILINE]
+            remaining = regex.flags & ~(re.UNICODE | re.ASCII | re.MULTILINE)
+            for re_flag, hs_flag in flag_map.items():
+                if remaining & re_flag:
+                    hs_flags.append(hs_flag)
+                    remaining &= ~re_flag
+            if remaining:
+                # a flag Hyperscan cannot express; the prefilter would drop
+                # matches, so fall back to the exact scan paths
+                return None
+            patterns.append(Pattern(regex.pattern.encode(), *hs_flags, tag=field))
+        try:
+            return BlockDatabase(*patterns)
+        except Exception:
+            return None
+
+    def _regex_engine(self):
+        """
+        Return the regex module for the selected backend, falling back to the
+        built-in re when google-re2 is not installed.
+        """
+        if self.backend == 're2':
+            try:
+                import re2
+                return re2
+            except ImportError:
+                pass
+        return re
+
     def compile_regexes(self, regex_dict: Dict[str, str]) -> Dict[str, re.Pattern]:
         """
         Compiles a dictionary of regex strings into regex patterns.
 
-        :param regex_dict: Dictionary where keys are field names and values are regex strings.
+        With the 're2' backend, patterns compile through google-re2, which is a
+        drop-in replacement with linear-time matching guarantees (no
+        catastrophic backtracking); patterns using constructs re2 does not
+        support (e.g. backreferences, lookaround) fall back to 're'.
+
+        :param regex_dict: Dictionary where keys are field names and values are regex strings
+                           (already-compiled re.Pattern objects are passed through as-is).
         :return: A dictionary with compiled regex patterns.
         """
-        return {field: re.compile(pattern) for field, pattern in regex_dict.items()}
+        engine = self._regex_engine()
+        flags = re.ASCII if self.ascii_mode else 0
+        compiled = {}
+        for field, pattern in regex_dict.items():
+            if isinstance(pattern, re.Pattern):
+                compiled[field] = pattern  # don't discard the caller's compile
+                continue
+            try:
+                compiled[field] = engine.compile(pattern, flags)
+            except Exception:
+                compiled[field] = re.compile(pattern, flags)
+        return compiled
 
-    def parse_record(self, record: namedtuple) -> namedtuple:
+    def combine_regexes(self, regexes: Dict[str, re.Pattern]) -> Optional[re.Pattern]:
+        """
+        Merge the field patterns into a single alternation, each wrapped in a named group,
+        so every line is scanned in one pass instead of once per field.
+
+        A pattern cannot live inside a shared alternation when it uses named groups
+        (they would collide with the wrappers or each other), backreferences (group
+        numbers shift when the alternatives are concatenated), or conditionals. Such
+        patterns are set aside in _extra_targets and scanned as separate match
+        streams that _extract_records merges with the combined stream by position.
+        Combinable and extra sources are first rewritten by _line_scoped so a
+        buffer match can never swallow a newline; patterns the rewrite cannot
+        handle land in _line_targets and are scanned line by line.
+
+        :param regexes: Dictionary of compiled regex patterns.
+        :return: The combined pattern, or None when no pattern is combinable, in
+                 which case extraction falls back to the per-line loop.
+        """
+        encoding = re.ASCII if self.ascii_mode else re.UNICODE
+        flags = re.MULTILINE | (re.ASCII if self.ascii_mode else 0)
+
+        combinable = {}
+        sources = {}
+        self._extra_targets = []
+        self._fast_targets = []
+        self._line_targets = []
+        for field, regex in regexes.items():
+            idxs = self._field_idxs[field]
+            # Flags beyond the alternation's own encoding (and MULTILINE, which
+            # it gets anyway) would be dropped by the source-level recombination;
+            # re.ASCII in particular only passes through when the alternation
+            # itself is compiled with it, otherwise \w and \s change meaning
+            odd_flags = regex.flags & ~(encoding | re.MULTILINE)
+            if not odd_flags and (fast_spec := self._fast_label_spec(regex.pattern)):
+                # Plain "label then token" pattern: str.find beats any regex engine
+                label, anchored, needs_ws = fast_spec
+                self._fast_targets.append((label, anchored, needs_ws, idxs))
+                continue
+            # Buffer scanning must not let a match swallow a newline that the
+            # per-line scanner would have stopped at; patterns that cannot be
+            # rewritten line-scoped are scanned line by line instead
+            source = None if regex.flags & re.DOTALL else self._line_scoped(regex.pattern)
+            if source is None:
+                self._line_targets.append((regex, idxs))
+            elif odd_flags or regex.groupindex or re.search(r'\\[1-9]|\(\?P|\(\?\(', regex.pattern):
+                # Recompile for buffer scanning, keeping the pattern's own flags;
+                # MULTILINE keeps ^/$ line-scoped
+                extra = re.compile(source, regex.flags | re.MULTILINE)
+                self._extra_targets.append((extra, idxs))
+            else:
+                combinable[field] = regex
+                sources[field] = source
+
+        if not combinable:
+            if not self._fast_targets and not self._extra_targets:
+                # Nothing to stream over the buffer; the per-line loop takes
+                # over and covers the line targets too
+                self._line_targets = []
+            return None
+
+        engine = self._regex_engine()
+        pattern = '|'.join(f'(?P<__f{i}>{sources[field]})' for i, field in enumerate(combinable))
+        try:
+            combined = engine.compile(pattern, flags)
+        except Exception:
+            try:
+                combined = re.compile(pattern, flags)
+            except re.error:
+                # The alternation itself is uncompilable; hand everything to the
+                # per-line fallback, which scans all fields - leaving fast or
+                # extra targets active here would silently drop the combinable
+                # fields from the buffer scan
+                self._extra_targets = []
+                self._fast_targets = []
+                self._line_targets = []
+                return None
+
+        # Map each wrapping group to the index of the sub-pattern's first inner
+        # capture group (groups are numbered left to right, so a sub-pattern's own
+        # groups immediately follow the group that wraps it) and to the record
+        # positions those groups fill.
+        self._combined_targets = {}
+        for i, field in enumerate(combinable):
+            name = f'__f{i}'
+            self._combined_targets[name] = (combined.groupindex[name] + 1, self._field_idxs[field])
+        return combined
+
+    def parse_record(self, record: list) -> list:
         """
         Normalize spaces in each field of the record by collapsing multiple spaces into one.
+        Fields that are already clean - the common case for regex-extracted values - skip
+        the substitution entirely. Returns a plain list; the CSV writer takes any
+        iterable, so nothing downstream needs the namedtuple.
         """
-        cleaned_values = {
-            field: re.sub(r'\s+', ' ', str(getattr(record, field))).strip() if getattr(record, field) else None
-            for field in record._fields}
-        return record._replace(**cleaned_values)
+        out = list(record)
+        for i, value in enumerate(out):
+            if not value:
+                out[i] = None
+                continue
+            if not isinstance(value, str):
+                value = str(value)
+            if self._WS_DIRTY_RE.search(value):
+                value = self._WS_RE.sub(' ', value).strip()
+            out[i] = value
+        return out
 
-    def process_pdf(self) -> None:
+    def process_pdf(self, show_progress: bool = True) -> None:
         """
-        Process the PDF and write the data directly to CSV line by line.
+        Process the PDF and write the extracted data to CSV.
+
+        :param show_progress: Display a progress bar while reading pages. Disable in batch
+                              drivers that loop over many small PDFs and report progress at
+                              the outer level.
         """
         if not self.regex_mode_enabled:
             raise RuntimeError("Cannot process PDF without regex. Use 'preview_regex_try' for manual inspection.")
 
-        with pymupdf.open(self.pdf_file_path) as doc, open(self.csv_file_path, mode='w', newline='',
-                                                        encoding='utf-8') as csvfile:
-            csv_writer = csv.writer(csvfile)
-            csv_writer.writerow(self.Line._fields)
-            record = self.empty_record
+        with pymupdf.open(self.pdf_file_path) as doc:
+            # page_count is a cheap attribute; len(doc) walks the page tree
+            texts = [self._page_text(page)
+                     for page in tqdm(doc, total=doc.page_count, desc="Reading PDF", unit="page",
+                                      mininterval=1.0, disable=not show_progress)]
 
-            for page in tqdm(doc, total=len(doc), desc="Processing PDF", unit="page"):
-                text = page.get_text("text", sort=True)
+        rows, partial = self._extract_records('\n'.join(texts))
+        self._write_csv(rows, partial)
 
-                for line in text.splitlines():
-                    # Process the extracted text
-                    record = self.extract_data_from_line(line, record)
-                    
-                    # Check if the record is ready to be written (last relevant field is filled)
-                    if self.is_record_complete(record):
-                        record = self.parse_record(record) 
-                        csv_writer.writerow(record)
-                        record = self.empty_record  # Reset for the next block
+    def process_pdf_parallel(self, max_workers: Optional[int] = None, pages_per_chunk: int = 8,
+                             show_progress: bool = True) -> None:
+        """
+        Process the PDF with one worker process per chunk of pages.
 
-            # Write any remaining record if the last page doesn't end with a complete record
-            if record != self.empty_record:
-                csv_writer.writerow(record)
+        Each worker opens its own copy of the document, extracts its pages'
+        text, and scans it from an empty record. Chunks are then stitched back
+        in order: when fields are still unfinished at a chunk boundary, the
+        next chunk is re-scanned sequentially with that carried state, because
+        a carried field changes where records complete - so the output is
+        identical to process_pdf. Page-text extraction always runs in
+        parallel; scanning only parallelizes across boundaries where no record
+        is in flight.
 
-    def is_record_complete(self, record: namedtuple) -> bool:
+        :param max_workers: Number of worker processes (defaults to the CPU count).
+        :param pages_per_chunk: Pages handed to a worker per task; keep it large
+                                enough to amortize reopening the document.
+        :param show_progress: Display a progress bar while chunks complete.
         """
-        Check if the record is complete by verifying that all required fields are non-null.
+        if not self.regex_mode_enabled:
+            raise RuntimeError("Cannot process PDF without regex. Use 'preview_regex_try' for manual inspection.")
+
+        with pymupdf.open(self.pdf_file_path) as doc:
+            num_pages = doc.page_count
+
+        ranges = [(start, min(start + pages_per_chunk, num_pages))
+                  for start in range(0, num_pages, pages_per_chunk)]
+
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            futures = [executor.submit(_extract_page_range, self.pdf_file_path, self._regex_source,
+                                       self.required_fields, self.backend, self.sort_text, self.ascii_mode,
+                                       start, stop)
+                       for start, stop in ranges]
+            results = [future.result()
+                       for future in tqdm(futures, desc="Processing PDF", unit="chunk",
+                                          mininterval=1.0, disable=not show_progress)]
+
+        rows = []
+        carry = [None] * self._num_fields
+        for chunk_text, chunk_rows, chunk_partial in results:
+            if any(value is not None for value in carry):
+                # A record is in flight across this boundary; the worker's rows
+                # were assembled without it and may complete at the wrong line,
+                # so re-scan the chunk with the carried state instead
+                chunk_rows, chunk_partial = self._extract_records(chunk_text, carry)
+            rows.extend(chunk_rows)
+            carry = chunk_partial
+
+        self._write_csv(rows, carry)
+
+    def _page_text(self, page) -> str:
+        """
+        Extract a page's plain text. The geometric reading-order sort is skipped
+        when sort_text is False; position-independent patterns don't need it.
         """
-        # Check if all required fields are non-null
-        return all(getattr(record, field) for field in self.required_fields)
+        return page.get_text("text", sort=self.sort_text)
 
-    def extract_data_from_line(self, line: str, record: namedtuple) -> namedtuple:
+    def _write_csv(self, rows: list, partial: list) -> None:
         """
-        Check each regex against the line and update the record accordingly.
-        Handles regex with multiple groups.
+        Encode the records and write the CSV file. Rows are pre-joined into
+        bytes and flushed in large batches, which is cheaper than a csv.writer
+        call per row.
+
+        :param rows: Completed records.
+        :param partial: Record left unfinished at the end of the document;
+                        written as-is when it holds any data.
         """
-        for field, regex in self.regexes.items():
+        with open(self.csv_file_path, mode='wb', buffering=1 << 20) as csvfile:
+            buffer = bytearray()
+            self._append_row(buffer, self.Line._fields)
+            for record in rows:
+                self._append_row(buffer, self.parse_record(record))
+                if len(buffer) >= self._FLUSH_BYTES:
+                    csvfile.write(buffer)
+                    buffer.clear()
+
+            # Write any remaining record if the document doesn't end with a complete record
+            if any(value is not None for value in partial):
+                self._append_row(buffer, partial)
+            csvfile.write(buffer)
+
+    def _append_row(self, buffer: bytearray, record) -> None:
+        """
+        Encode one record as a CSV line directly into the shared output buffer,
+        avoiding a per-row bytes allocation. Fields are written verbatim and
+        only quoted (RFC 4180) when they contain a comma, quote, or newline.
+        """
+        for i, value in enumerate(record):
+            if i:
+                buffer += b','
+            if value is None:
+                continue
+            if self._CSV_UNSAFE.search(value):
+                value = '"' + value.replace('"', '""') + '"'
+            buffer += value.encode('utf-8')
+        buffer += b'\r\n'
+
+    def _extract_records(self, text: str, record: Optional[list] = None) -> Tuple[list, list]:
+        """
+        Scan a text buffer and collect records, flushing one whenever the
+        required fields are all filled.
+
+        :param text: Concatenated page text.
+        :param record: Partially filled record to continue from (a fresh one is
+                       started when omitted).
+        :return: A tuple of (completed records, partial record left over at the
+                 end of the buffer).
+        """
+        if self._hyperscan is not None:
+            return self._extract_records_hyperscan(text, record)
+
+        rows = []
+        if record is None:
+            record = [None] * self._num_fields
+
+        # One stream per scanning strategy: the combined alternation, patterns
+        # that could not join it, the regex-free label-token scanners, and the
+        # patterns that must see one line at a time. All yield (start, end,
+        # record positions, values) in document order.
+        streams = []
+        if self.combined is not None:
+            streams.append(self._combined_events(text))
+        streams += [self._pattern_events(regex, idxs, text)
+                    for regex, idxs in self._extra_targets]
+        streams += [self._fast_events(label, anchored, needs_ws, idxs, text)
+                    for label, anchored, needs_ws, idxs in self._fast_targets]
+        streams += [self._line_events(regex, idxs, text)
+                    for regex, idxs in self._line_targets]
+
+        if streams:
+            # Scanning the whole buffer keeps the loops inside the regex engine
+            # (or stringlib) instead of iterating lines in Python. Completeness
+            # is only checked at line boundaries (i.e. when the next match lies
+            # past the previous match's line), mirroring the per-line scanner:
+            # all fields found on one line belong to the same record.
+            if len(streams) == 1:
+                events = streams[0]
+            else:
+                events = heapq.merge(*streams, key=lambda event: event[0])
+            line_end = None
+            for start, end, idxs, groups in events:
+                if line_end is not None and start > line_end and self.is_record_complete(record):
+                    rows.append(record)
+                    record = [None] * self._num_fields
+                for idx, group in zip(idxs, groups):
+                    record[idx] = group
+                line_end = text.find('\n', end)
+                if line_end == -1:
+                    line_end = len(text)
+            if self.is_record_complete(record):
+                rows.append(record)
+                record = [None] * self._num_fields
+        else:
+            # split('\n') is cheaper than splitlines(), which also handles
+            # \r\n, \v, form feeds, etc. that get_text never emits mid-page
+            for line in text.split('\n'):
+                record = self.extract_data_from_line(line, record)
+                if self.is_record_complete(record):
+                    rows.append(record)
+                    record = [None] * self._num_fields
+
+        return rows, record
+
+    def _combined_events(self, text: str):
+        """
+        Yield (start, end, record positions, values) for each match of the
+        combined pattern over the buffer.
+        """
+        for match in self.combined.finditer(text):
+            first_group, idxs = self._combined_targets[match.lastgroup]
+            yield (match.start(), match.end(), idxs,
+                   tuple(match.group(first_group + i) for i in range(len(idxs))))
+
+    @staticmethod
+    def _pattern_events(regex: re.Pattern, idxs: tuple, text: str):
+        """
+        Yield (start, end, record positions, values) for each match of a single
+        pattern over the buffer; used for patterns excluded from the alternation.
+        """
+        for match in regex.finditer(text):
+            yield match.start(), match.end(), idxs, match.groups()
+
+    @staticmethod
+    def _line_events(regex: re.Pattern, idxs: tuple, text: str):
+        """
+        Per-line variant of _pattern_events for patterns _line_scoped cannot
+        make newline-safe; searches each line in isolation, exactly like the
+        per-line fallback would.
+        """
+        offset = 0
+        for line in text.split('\n'):
             if match := regex.search(line):
-                groups = match.groups()
-                if len(groups) == 1:
-                    # Single group, map directly to the field
-                    record = record._replace(**{field: groups[0]})
-                else:
-                    # Multiple groups, map to corresponding fields with suffixes
-                    record = record._replace(**{f"{field}_{i + 1}": group for i, group in enumerate(groups)})
+                yield offset + match.start(), offset + match.end(), idxs, match.groups()
+            offset += len(line) + 1
+
+    def _extract_records_hyperscan(self, text: str, record: Optional[list] = None) -> Tuple[list, list]:
+        """
+        Hyperscan-prefiltered variant of _extract_records: scan the raw bytes
+        once to learn which patterns hit where, then re-run only those patterns
+        on their enclosing lines to pull capture groups. Lines with no hits
+        never touch the Python regex engine.
+        """
+        from pyperscan import Scan
+
+        data = text.encode('utf-8')
+        hits = []
+
+        def on_match(_context, field, start, _end):
+            hits.append((start, field))
+            return Scan.Continue
+
+        self._hyperscan.build(None, on_match).scan(data)
+        # Hyperscan reports matches by end offset; records depend on document order
+        hits.sort()
+
+        rows = []
+        if record is None:
+            record = [None] * self._num_fields
+        seen = set()
+        current_line = None
+
+        for start, field in hits:
+            line_start = data.rfind(b'\n', 0, start) + 1
+            if (line_start, field) in seen:
+                continue  # several reports for the same pattern on one line
+
+            # Flush at line boundaries only, so all fields found on one line
+            # belong to the same record (as in the per-line scanner)
+            if current_line is not None and line_start != current_line and self.is_record_complete(record):
+                rows.append(record)
+                record = [None] * self._num_fields
+            seen.add((line_start, field))
+            current_line = line_start
+
+            line_end = data.find(b'\n', start)
+            if line_end == -1:
+                line_end = len(data)
+            line = data[line_start:line_end].decode('utf-8', errors='replace')
+
+            if match := self.regexes[field].search(line):
+                for idx, group in zip(self._field_idxs[field], match.groups()):
+                    record[idx] = group
+
+        if self.is_record_complete(record):
+            rows.append(record)
+            record = [None] * self._num_fields
+
+        return rows, record
+
+    def is_record_complete(self, record: list) -> bool:
+        """
+        Check if the record is complete by verifying that all required fields are non-null.
+        """
+        # Check if all required fields are non-null (and non-empty, matching the
+        # original truthiness semantics for patterns like (\d*) that can
+        # capture an empty string)
+        return all(record[i] for i in self._required_idx)
+
+    def extract_data_from_line(self, line: str, record: list) -> list:
+        """
+        Check the regexes against the line and update the record in place.
+        Handles regex with multiple groups. The per-line scan covers every
+        field, including those the buffer streams serve through the fast or
+        extra paths.
+        """
+        for idx, group in self._scan_line(line):
+            record[idx] = group
         return record
 
+    def _scan_line_uncached(self, line: str) -> tuple:
+        """
+        Run the per-field patterns against one line and return the matches as
+        (record position, value) pairs. When the Aho-Corasick prefilter is
+        available, only the patterns whose literal prefix occurs in the line are
+        tried. Wrapped with lru_cache per instance so repeated lines are
+        answered from the cache.
+        """
+        targets = self._always_targets
+        if self._ac is not None:
+            hit_fields = {field for _, fields in self._ac.iter(line) for field in fields}
+            if hit_fields:
+                targets = targets + [self._ac_targets[field] for field in hit_fields]
+
+        found = []
+        for search, idxs in targets:
+            if match := search(line):
+                found.extend(zip(idxs, match.groups()))
+        return tuple(found)
+
     def preview_regex_try(self, page_from_to: Tuple[int, int] = (0, 5), match_type: str = 'both') -> None:
         """
         Preview the output of the regex patterns on the specified pages, allowing filtering for success, failure, or both.
@@ -139,7 +782,7 @@ class PDFProcessor:
         with pymupdf.open(self.pdf_file_path) as doc:
             for page_number in range(page_from_to[0], min(page_from_to[1], len(doc))):
                 page = doc.load_page(page_number)
-                text = page.get_text("text", sort=True)
+                text = self._page_text(page)
 
                 print(f"\n\n--- Preview of Page {page_number + 1} ---\n")
 
@@ -161,3 +804,22 @@ class PDFProcessor:
                             elif not match and match_type in ['fail', 'both']:
                                 print(f"\nProcessing line: {line}")
                                 print(f"Field '{field}' did not match.")
+
+
+def _extract_page_range(pdf_file_path: str, regexes: Dict[str, Pattern], required_fields: Optional[list],
+                        backend: str, sort_text: bool, ascii_mode: bool,
+                        start: int, stop: int) -> Tuple[str, list, list]:
+    """
+    Worker for process_pdf_parallel: extract records from a page range in its
+    own process. Each worker opens its own copy of the document, since PyMuPDF
+    documents cannot be shared across processes. The chunk's text is returned
+    alongside the records so the parent can re-scan it when a record carried
+    over from the previous chunk invalidates this chunk's fresh scan.
+    """
+    processor = PDFProcessor(pdf_file_path, regexes=regexes, required_fields=required_fields,
+                             backend=backend, sort_text=sort_text, ascii_mode=ascii_mode)
+    with pymupdf.open(pdf_file_path) as doc:
+        text = '\n'.join(processor._page_text(doc.load_page(number))
+                         for number in range(start, stop))
+    rows, partial = processor._extract_records(text)
+    return text, rows, partial